@@ -0,0 +1,14 @@
+import functools
+
+from google.cloud import bigquery
+
+
+@functools.lru_cache(maxsize=4)
+def get_client(project_id):
+    """Return a memoized BigQuery client for the project.
+
+    Client construction runs credential discovery and TLS setup (hundreds
+    of milliseconds); caching it also lets callers share the underlying
+    HTTP transport.
+    """
+    return bigquery.Client(project=project_id)
@@ -1,3 +1,4 @@
+import functools
 import os
 
 # BigQuery Configuration
@@ -13,12 +14,28 @@ FALLBACK_PROJECTS = [
     "bigquery-public-data",  # For testing with public data
 ]
 
+@functools.lru_cache(maxsize=1)
 def get_bigquery_config():
-    """Get validated BigQuery configuration"""
-    config = BIGQUERY_CONFIG.copy()
-    
-    # Ensure project_id is set
-    if not config["project_id"]:
-        config["project_id"] = input("Please enter your Google Cloud Project ID: ")
-    
-    return config
\ No newline at end of file
+    """Get validated BigQuery configuration (resolved once per process)"""
+    project_id = BIGQUERY_CONFIG["project_id"]
+
+    # Fail fast instead of blocking on stdin — servers and async pipelines
+    # must not hang on an interactive prompt
+    if not project_id:
+        raise RuntimeError(
+            "GOOGLE_CLOUD_PROJECT environment variable must be set. "
+            "For interactive use, call configure_interactive() first."
+        )
+
+    return {
+        "project_id": project_id,
+        "dataset_id": BIGQUERY_CONFIG["dataset_id"],
+        "table_id": BIGQUERY_CONFIG["table_id"],
+    }
+
+def configure_interactive():
+    """Prompt for the project ID on a CLI and store it for this process"""
+    if not BIGQUERY_CONFIG["project_id"]:
+        BIGQUERY_CONFIG["project_id"] = input("Please enter your Google Cloud Project ID: ")
+        get_bigquery_config.cache_clear()
+    return get_bigquery_config()
\ No newline at end of file
@@ -1,13 +1,27 @@
+import io
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import json
-import random
+import orjson
+
+DIAGNOSES = [
+    'Hypertension', 'Diabetes', 'Anxiety', 'Depression', 'Common Cold',
+    'Back Pain', 'Migraine', 'Insomnia', 'Allergies', 'Stomach Flu'
+]
+
+# Rule 1 combos, filtered once at import to those with a generatable
+# diagnosis ('Surgery' entries document intent but can never occur)
+_UNUSUAL_COMBOS = frozenset(
+    (p, d) for p, d in [
+        ('Mental Health Session', 'Common Cold'),
+        ('Emergency Consult', 'Allergies'),
+        ('Virtual Consultation', 'Surgery'),  # Shouldn't happen in telehealth
+        ('Mental Health Session', 'Surgery')  # Invalid combo
+    ] if d in set(DIAGNOSES)
+)
 
 def generate_synthetic_insurance_data():
-    np.random.seed(42)
-    random.seed(42)
-    
+    rng = np.random.default_rng(42)
+
     # Define base data
     procedures = {
         'Virtual Consultation': {'avg_cost': 150, 'duration': 30},
@@ -17,86 +31,80 @@ def generate_synthetic_insurance_data():
         'Emergency Consult': {'avg_cost': 300, 'duration': 45}
     }
     
-    diagnoses = [
-        'Hypertension', 'Diabetes', 'Anxiety', 'Depression', 'Common Cold',
-        'Back Pain', 'Migraine', 'Insomnia', 'Allergies', 'Stomach Flu'
-    ]
-    
     states = ['CA', 'NY', 'TX', 'FL', 'IL', 'PA', 'OH', 'GA', 'NC', 'MI']
     providers = ['TeleHealth Inc', 'VirtualCare Co', 'RemoteMed Group', 'DigitalDoc Services']
     
-    # Generate claims data
-    claims = []
-    
-    for i in range(1000):  # 1000 claims
-        claim_id = f"CLM_{10000 + i}"
-        patient_id = f"PAT_{random.randint(1000, 9999)}"
-        provider = random.choice(providers)
-        procedure = random.choice(list(procedures.keys()))
-        diagnosis = random.choice(diagnoses)
-        state = random.choice(states)
-        
-        # Base cost with some variation
-        base_cost = procedures[procedure]['avg_cost']
-        cost_variation = np.random.normal(0, base_cost * 0.3)
-        claim_amount = max(50, base_cost + cost_variation)
-        
-        # Date in 2024
-        claim_date = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 364))
-        
-        # Create some outlier patterns
-        is_outlier = False
-        outlier_reason = None
-        
-        # Rule 1: Unusual diagnosis + procedure combinations
-        unusual_combos = [
-            ('Mental Health Session', 'Common Cold'),
-            ('Emergency Consult', 'Allergies'),
-            ('Virtual Consultation', 'Surgery'),  # Shouldn't happen in telehealth
-            ('Mental Health Session', 'Surgery')  # Invalid combo
-        ]
-        
-        if (procedure, diagnosis) in [(p, d) for p, d in unusual_combos if d in diagnoses]:
-            is_outlier = True
-            outlier_reason = 'Unusual diagnosis-procedure combination'
-        
-        # Rule 2: Abnormally high claim amount
-        elif claim_amount > procedures[procedure]['avg_cost'] * 3:
-            is_outlier = True
-            outlier_reason = 'Abnormally high claim amount'
-        
-        # Rule 3: Geographic mismatch (telehealth not covered in certain states/scenarios)
-        elif state in ['WY', 'AK', 'MT'] and procedure == 'Virtual Consultation':
-            is_outlier = True
-            outlier_reason = 'Geographic coverage restriction'
-        
-        # Rule 4: Multiple high-cost claims from same patient
-        elif random.random() < 0.02:  # 2% chance for testing
-            is_outlier = True
-            outlier_reason = 'Suspicious claim pattern'
-        
-        claims.append({
-            'claim_id': claim_id,
-            'patient_id': patient_id,
-            'provider_name': provider,
-            'procedure_type': procedure,
-            'diagnosis': diagnosis,
-            'claim_amount': round(claim_amount, 2),
-            'claim_date': claim_date.strftime('%Y-%m-%d'),
-            'patient_state': state,
-            'is_outlier': is_outlier,
-            'outlier_reason': outlier_reason,
-            'review_required': is_outlier,
-            'claim_status': 'Pending' if is_outlier else 'Approved'
-        })
-    
-    return pd.DataFrame(claims)
+    # Generate claims data column-wise with NumPy (one C-level pass per column
+    # instead of 1000 Python loop iterations)
+    n_claims = 1000
+
+    procedure_names = np.array(list(procedures.keys()))
+    avg_costs = np.array([procedures[p]['avg_cost'] for p in procedure_names])
+
+    claim_ids = np.char.add('CLM_', (10000 + np.arange(n_claims)).astype(str))
+    patient_ids = np.char.add('PAT_', rng.integers(1000, 10000, n_claims).astype(str))
+    provider_col = rng.choice(providers, n_claims)
+    procedure_idx = rng.integers(0, len(procedure_names), n_claims)
+    procedure_col = procedure_names[procedure_idx]
+    diagnosis_col = rng.choice(DIAGNOSES, n_claims)
+    state_col = rng.choice(states, n_claims)
+
+    # Base cost with some variation
+    base_costs = avg_costs[procedure_idx]
+    cost_variation = rng.normal(0, base_costs * 0.3)
+    claim_amounts = np.maximum(50, base_costs + cost_variation).round(2)
+
+    # Dates in 2024
+    claim_dates = (np.datetime64('2024-01-01') +
+                   rng.integers(0, 365, n_claims).astype('timedelta64[D]'))
+
+    # Create some outlier patterns
+    # Rule 1: Unusual diagnosis + procedure combinations
+    combo_mask = pd.MultiIndex.from_arrays([procedure_col, diagnosis_col]).isin(_UNUSUAL_COMBOS)
 
-def upload_to_bigquery(df, project_id, dataset_id):
+    # Rule 2: Abnormally high claim amount
+    high_mask = claim_amounts > base_costs * 3
+
+    # Rule 3: Geographic mismatch (telehealth not covered in certain states/scenarios)
+    geo_mask = np.isin(state_col, ['WY', 'AK', 'MT']) & (procedure_col == 'Virtual Consultation')
+
+    # Rule 4: Multiple high-cost claims from same patient (2% chance for testing)
+    random_mask = rng.random(n_claims) < 0.02
+
+    # Single fused pass: np.select picks the first matching rule per row
+    # (same priority as the original if/elif chain) without the four
+    # separate fancy-indexing writes
+    outlier_reason = np.select(
+        [combo_mask, high_mask, geo_mask, random_mask],
+        ['Unusual diagnosis-procedure combination',
+         'Abnormally high claim amount',
+         'Geographic coverage restriction',
+         'Suspicious claim pattern'],
+        default=None
+    )
+    is_outlier = outlier_reason != None  # noqa: E711 - elementwise comparison
+
+    return pd.DataFrame({
+        'claim_id': claim_ids,
+        'patient_id': patient_ids,
+        'provider_name': provider_col,
+        'procedure_type': procedure_col,
+        'diagnosis': diagnosis_col,
+        'claim_amount': claim_amounts,
+        'claim_date': claim_dates.astype(str),
+        'patient_state': state_col,
+        'is_outlier': is_outlier,
+        'outlier_reason': outlier_reason,
+        'review_required': is_outlier,
+        'claim_status': np.where(is_outlier, 'Pending', 'Approved')
+    })
+
+def upload_to_bigquery(df, project_id, dataset_id, chunk_size=100_000):
     from google.cloud import bigquery
-    
-    client = bigquery.Client(project=project_id)
-    
+    from bq_client import get_client
+
+    client = get_client(project_id)
+
     # Create dataset if not exists
     dataset_ref = client.dataset(dataset_id)
     try:
@@ -108,14 +116,45 @@ def upload_to_bigquery(df, project_id, dataset_id):
         client.create_dataset(dataset)
         print(f"Created dataset {dataset_id}")
     
-    # Upload data
+    # Upload data as parquet with an explicit schema (skips the autodetect
+    # probing roundtrip; parquet serialization is ~2x faster than CSV)
     table_ref = dataset_ref.table("insurance_claims")
-    job_config = bigquery.LoadJobConfig()
-    job_config.write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
-    job_config.autodetect = True
-    
-    job = client.load_table_from_dataframe(df, table_ref, job_config=job_config)
-    job.result()
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        schema=[
+            bigquery.SchemaField("claim_id", "STRING"),
+            bigquery.SchemaField("patient_id", "STRING"),
+            bigquery.SchemaField("provider_name", "STRING"),
+            bigquery.SchemaField("procedure_type", "STRING"),
+            bigquery.SchemaField("diagnosis", "STRING"),
+            bigquery.SchemaField("claim_amount", "FLOAT"),
+            bigquery.SchemaField("claim_date", "DATE"),
+            bigquery.SchemaField("patient_state", "STRING"),
+            bigquery.SchemaField("is_outlier", "BOOLEAN"),
+            bigquery.SchemaField("outlier_reason", "STRING"),
+            bigquery.SchemaField("review_required", "BOOLEAN"),
+            bigquery.SchemaField("claim_status", "STRING"),
+        ],
+    )
+
+    # Native DATE values so parquet carries real timestamps, not strings
+    df = df.assign(claim_date=pd.to_datetime(df['claim_date']).dt.date)
+
+    # Load in chunks so memory stays bounded for large frames; the first
+    # chunk truncates, the rest append. Each chunk is serialized to an
+    # in-memory snappy parquet buffer and loaded as a file, so BigQuery
+    # ingests columnar, dictionary-encoded data directly.
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        job_config.write_disposition = (
+            bigquery.WriteDisposition.WRITE_TRUNCATE if start == 0
+            else bigquery.WriteDisposition.WRITE_APPEND
+        )
+        buffer = io.BytesIO()
+        chunk.to_parquet(buffer, engine='pyarrow', compression='snappy')
+        buffer.seek(0)
+        job = client.load_table_from_file(buffer, table_ref, job_config=job_config)
+        job.result()
     
     print(f"Uploaded {len(df)} rows to {dataset_id}.insurance_claims")
 
@@ -123,8 +162,10 @@ if __name__ == "__main__":
     # Generate data
     df = generate_synthetic_insurance_data()
     
-    # Save to JSON for evaluation
-    df.to_json("insurance_claims_dataset.json", orient="records", indent=2)
+    # Save to JSON for evaluation (orjson is C-level; the file is machine-read,
+    # so skip pretty-printing)
+    with open("insurance_claims_dataset.json", "wb") as f:
+        f.write(orjson.dumps(df.to_dict(orient="records")))
     print("Saved dataset to insurance_claims_dataset.json")
     
     # Upload to BigQuery (uncomment and set your project ID)
@@ -1,4 +1,5 @@
 import uuid
+import orjson
 import pandas as pd
 from datetime import datetime
 from vertexai.preview.evaluation import EvalTask
@@ -71,7 +72,10 @@ completeness_metric = PointwiseMetric(
 tool_use_metric = TrajectorySingleToolUse(tool_name="list_table_ids")
 
 def run_eval():
-    eval_dataset = pd.read_json("evaluation_dataset.json")
+    # orjson parse + from_records is several times faster than pd.read_json
+    # and avoids the pandas JSON reader's intermediate object churn
+    with open("evaluation_dataset.json", "rb") as f:
+        eval_dataset = pd.DataFrame.from_records(orjson.loads(f.read()))
 
     current_time = datetime.now().strftime("%Y%m%d-%H%M%S")
     experiment_run_id = f"{current_time}-{uuid.uuid4().hex[:8]}"
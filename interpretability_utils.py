@@ -1,62 +1,187 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
-import json
-import datetime
+from typing import ClassVar, Dict, List, Any, NamedTuple
+import orjson
+import time
 import hashlib
 
+
+class Rule(NamedTuple):
+    """An activated business rule. Lighter than a per-rule dict and
+    attribute access avoids hashing."""
+    rule_id: str
+    description: str
+    confidence: str
+    evidence: str
+
+# Static rule/lookup structures, built once at import instead of per call
+_PROCEDURE_NORMS = {
+    'Virtual Consultation': {'avg': 150, 'std': 45, 'max_normal': 450},
+    'Mental Health Session': {'avg': 200, 'std': 60, 'max_normal': 600},
+    'Prescription Refill': {'avg': 50, 'std': 15, 'max_normal': 150},
+    'Follow-up Visit': {'avg': 120, 'std': 36, 'max_normal': 360},
+    'Emergency Consult': {'avg': 300, 'std': 90, 'max_normal': 900}
+}
+
+_PROC_THRESH = {procedure: norm['max_normal'] for procedure, norm in _PROCEDURE_NORMS.items()}
+
+_DIAGNOSIS_CATEGORIES = {
+    'Mental Health': ['Anxiety', 'Depression', 'Insomnia'],
+    'Physical': ['Hypertension', 'Diabetes', 'Common Cold', 'Back Pain',
+                'Migraine', 'Allergies', 'Stomach Flu']
+}
+
+# Inverted map for O(1) diagnosis -> category lookup
+_DIAG_CAT = {diag: cat for cat, diags in _DIAGNOSIS_CATEGORIES.items() for diag in diags}
+
+_UNUSUAL_COMBOS = frozenset([
+    ('Mental Health Session', 'Common Cold'),
+    ('Mental Health Session', 'Back Pain'),
+    ('Emergency Consult', 'Allergies'),
+    ('Emergency Consult', 'Common Cold')
+])
+
+_RESTRICTED_STATES = frozenset({'WY', 'AK', 'MT'})
+
+# Bit positions for the rules bitmask in batch reports (1 byte per claim
+# instead of a list of rule records)
+RULE_UNUSUAL_COMBO = 1 << 0
+RULE_HIGH_AMOUNT = 1 << 1
+RULE_GEOGRAPHIC_RESTRICTION = 1 << 2
+
+# Only the high-cost procedures get amount counterfactuals
+_COUNTERFACTUAL_THRESH = {
+    'Virtual Consultation': 450,
+    'Mental Health Session': 600,
+    'Emergency Consult': 900
+}
+
+class AuditLogWriter:
+    """Streams audit entries to a parquet file in bounded batches.
+
+    Holds at most batch_size entries in memory; each flush converts the
+    batch to a pyarrow table and appends it to the file, so peak memory
+    stays constant regardless of how many claims are audited.
+    """
+
+    def __init__(self, path: str, batch_size: int = 10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self._batch = []
+        self._writer = None
+
+    def write(self, audit_entry: Dict):
+        self._batch.append(audit_entry)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._batch:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Explicit schema for create_audit_log entries: inferring per batch
+        # makes the list columns come out as list<null> when every entry in
+        # a batch has empty lists, and the next flush then fails the
+        # ParquetWriter schema check
+        schema = pa.schema([
+            ('timestamp_ns', pa.int64()),
+            ('claim_id', pa.string()),
+            ('decision', pa.string()),
+            ('rules_activated', pa.list_(pa.string())),
+            ('confidence_scores', pa.list_(pa.string())),
+            ('decision_pathway', pa.list_(pa.string())),
+            ('system_version', pa.string()),
+            ('audit_hash', pa.string()),
+            ('validation_status', pa.struct([
+                ('valid', pa.bool_()),
+                ('errors', pa.list_(pa.string())),
+            ])),
+        ])
+
+        table = pa.Table.from_pylist(self._batch, schema=schema)
+        # One columnar cast per batch instead of per-entry formatting
+        idx = table.column_names.index('timestamp_ns')
+        timestamps = table.column(idx).cast(pa.timestamp('ns', tz='UTC'))
+        table = table.set_column(idx, 'timestamp', timestamps)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+        self._batch.clear()
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class MechanisticInterpreter:
     """Utility class for mechanistic interpretability analysis"""
     
-    VALID_STATES = {
+    VALID_STATES: ClassVar[frozenset] = frozenset({
         'AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA',
         'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD',
         'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ',
         'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC',
         'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
-    }
-    
+    })
+
+    VALID_PROCEDURES: ClassVar[frozenset] = frozenset({
+        'Virtual Consultation', 'Mental Health Session',
+        'Prescription Refill', 'Follow-up Visit', 'Emergency Consult'
+    })
+
     @staticmethod
     def validate_claim_data(claim_data: Dict) -> Dict:
         """Validate claim data with bounds checking"""
         errors = []
-        
+
         # Validate amount
         amount = claim_data.get('claim_amount', 0)
         if not (1 <= amount <= 10000):
             errors.append(f"Invalid claim amount: ${amount}. Must be between $1 and $10,000")
-        
+
         # Validate state
         state = claim_data.get('patient_state', '').upper()
         if state not in MechanisticInterpreter.VALID_STATES:
             errors.append(f"Invalid state code: {state}")
-        
+
         # Validate procedure type
-        valid_procedures = {'Virtual Consultation', 'Mental Health Session', 
-                           'Prescription Refill', 'Follow-up Visit', 'Emergency Consult'}
         procedure = claim_data.get('procedure_type')
-        if procedure and procedure not in valid_procedures:
+        if procedure and procedure not in MechanisticInterpreter.VALID_PROCEDURES:
             errors.append(f"Invalid procedure type: {procedure}")
-        
+
         return {'valid': len(errors) == 0, 'errors': errors}
+
+    @staticmethod
+    def validate_claim_data_batch(claims_df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized validation: one isin/comparison pass per check"""
+        amounts = claims_df['claim_amount']
+        valid_amount = (amounts >= 1) & (amounts <= 10000)
+        valid_state = (claims_df['patient_state'].str.upper()
+                       .isin(MechanisticInterpreter.VALID_STATES))
+        valid_procedure = (claims_df['procedure_type'].isna()
+                           | claims_df['procedure_type'].isin(MechanisticInterpreter.VALID_PROCEDURES))
+
+        return pd.DataFrame({
+            'claim_id': claims_df['claim_id'].to_numpy(),
+            'valid_amount': valid_amount.to_numpy(),
+            'valid_state': valid_state.to_numpy(),
+            'valid_procedure': valid_procedure.to_numpy(),
+            'valid': (valid_amount & valid_state & valid_procedure).to_numpy()
+        })
     
     @staticmethod
     def analyze_claim_features(claim_data: Dict) -> Dict:
         """Analyze individual claim features against normal ranges"""
-        procedure_norms = {
-            'Virtual Consultation': {'avg': 150, 'std': 45, 'max_normal': 450},
-            'Mental Health Session': {'avg': 200, 'std': 60, 'max_normal': 600},
-            'Prescription Refill': {'avg': 50, 'std': 15, 'max_normal': 150},
-            'Follow-up Visit': {'avg': 120, 'std': 36, 'max_normal': 360},
-            'Emergency Consult': {'avg': 300, 'std': 90, 'max_normal': 900}
-        }
-        
-        diagnosis_categories = {
-            'Mental Health': ['Anxiety', 'Depression', 'Insomnia'],
-            'Physical': ['Hypertension', 'Diabetes', 'Common Cold', 'Back Pain', 
-                        'Migraine', 'Allergies', 'Stomach Flu']
-        }
-        
         analysis = {
             'procedure_analysis': {},
             'diagnosis_analysis': {},
@@ -66,8 +191,8 @@ class MechanisticInterpreter:
         
         # Procedure analysis
         procedure = claim_data.get('procedure_type')
-        if procedure in procedure_norms:
-            norm = procedure_norms[procedure]
+        if procedure in _PROCEDURE_NORMS:
+            norm = _PROCEDURE_NORMS[procedure]
             amount = claim_data.get('claim_amount', 0)
             analysis['procedure_analysis'] = {
                 'expected_range': f"${norm['avg'] - norm['std']} - ${norm['avg'] + norm['std']}",
@@ -79,69 +204,52 @@ class MechanisticInterpreter:
         # Diagnosis-procedure compatibility
         diagnosis = claim_data.get('diagnosis')
         analysis['diagnosis_analysis'] = {
-            'diagnosis_category': next((cat for cat, diags in diagnosis_categories.items() 
-                                      if diagnosis in diags), 'Unknown'),
+            'diagnosis_category': _DIAG_CAT.get(diagnosis, 'Unknown'),
             'typical_procedures': 'Mental Health procedures typically for Mental Health diagnoses'
         }
         
         return analysis
     
     @staticmethod
-    def evaluate_business_rules(claim_data: Dict) -> List[Dict]:
+    def evaluate_business_rules(claim_data: Dict) -> List[Rule]:
         """Evaluate which business rules are activated for a claim"""
         rules_activated = []
-        
+
         # Rule 1: Unusual diagnosis-procedure combinations
-        unusual_combos = [
-            ('Mental Health Session', 'Common Cold'),
-            ('Mental Health Session', 'Back Pain'),
-            ('Emergency Consult', 'Allergies'),
-            ('Emergency Consult', 'Common Cold')
-        ]
-        
         procedure = claim_data.get('procedure_type')
         diagnosis = claim_data.get('diagnosis')
-        
-        if (procedure, diagnosis) in unusual_combos:
-            rules_activated.append({
-                'rule_id': 'UNUSUAL_COMBO',
-                'description': f'Unusual combination: {procedure} + {diagnosis}',
-                'confidence': 'High',
-                'evidence': 'Combination statistically rare in historical data'
-            })
-        
+
+        if (procedure, diagnosis) in _UNUSUAL_COMBOS:
+            rules_activated.append(Rule(
+                'UNUSUAL_COMBO',
+                f'Unusual combination: {procedure} + {diagnosis}',
+                'High',
+                'Combination statistically rare in historical data'
+            ))
+
         # Rule 2: High claim amount
-        procedure_norms = {
-            'Virtual Consultation': 450,
-            'Mental Health Session': 600,
-            'Prescription Refill': 150,
-            'Follow-up Visit': 360,
-            'Emergency Consult': 900
-        }
-        
         amount = claim_data.get('claim_amount', 0)
-        threshold = procedure_norms.get(procedure, float('inf'))
-        
+        threshold = _PROC_THRESH.get(procedure, float('inf'))
+
         if amount > threshold:
-            rules_activated.append({
-                'rule_id': 'HIGH_AMOUNT',
-                'description': f'Claim amount ${amount} exceeds ${threshold} threshold',
-                'confidence': 'High' if amount > threshold * 1.5 else 'Medium',
-                'evidence': f'{amount/threshold*100:.1f}% above expected maximum'
-            })
-        
+            rules_activated.append(Rule(
+                'HIGH_AMOUNT',
+                f'Claim amount ${amount} exceeds ${threshold} threshold',
+                'High' if amount > threshold * 1.5 else 'Medium',
+                f'{amount/threshold*100:.1f}% above expected maximum'
+            ))
+
         # Rule 3: Geographic mismatch
-        restricted_states = ['WY', 'AK', 'MT']
         state = claim_data.get('patient_state')
-        
-        if state in restricted_states and procedure == 'Virtual Consultation':
-            rules_activated.append({
-                'rule_id': 'GEOGRAPHIC_RESTRICTION',
-                'description': f'Virtual consultation from restricted state: {state}',
-                'confidence': 'High',
-                'evidence': 'State not covered for virtual consultations'
-            })
-        
+
+        if state in _RESTRICTED_STATES and procedure == 'Virtual Consultation':
+            rules_activated.append(Rule(
+                'GEOGRAPHIC_RESTRICTION',
+                f'Virtual consultation from restricted state: {state}',
+                'High',
+                'State not covered for virtual consultations'
+            ))
+
         return rules_activated
     
     @staticmethod
@@ -164,25 +272,72 @@ class MechanisticInterpreter:
         return report
     
     @staticmethod
-    def trace_decision_pathway(rules_activated: List[Dict]) -> List[str]:
+    def generate_reports_batch(claims_df: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized rule evaluation across an entire claims frame.
+
+        Columnar counterpart of generate_interpretability_report: each
+        business rule becomes one boolean mask computed in a single pass
+        over the frame, instead of per-claim Python helper calls.
+        """
+        unusual_mask = pd.MultiIndex.from_arrays(
+            [claims_df['procedure_type'], claims_df['diagnosis']]
+        ).isin(_UNUSUAL_COMBOS)
+
+        # Vectorized threshold lookup; unknown procedures get inf so they
+        # never trip the amount rule (matches the per-claim .get default)
+        thresholds = (claims_df['procedure_type'].map(_PROC_THRESH)
+                      .fillna(np.inf).to_numpy(dtype=float))
+        amounts = claims_df['claim_amount'].to_numpy(dtype=float)
+        high_mask = amounts > thresholds
+        high_confidence = amounts > thresholds * 1.5
+        pct_above = amounts / thresholds * 100
+
+        geo_mask = (claims_df['patient_state'].isin(_RESTRICTED_STATES)
+                    & (claims_df['procedure_type'] == 'Virtual Consultation')).to_numpy()
+
+        # Pack the three rules into one uint8 per claim; counting activated
+        # rules becomes a vectorized popcount over the packed bits
+        rules_mask = ((unusual_mask.astype(np.uint8) * RULE_UNUSUAL_COMBO)
+                      | (high_mask.astype(np.uint8) * RULE_HIGH_AMOUNT)
+                      | (geo_mask.astype(np.uint8) * RULE_GEOGRAPHIC_RESTRICTION))
+        rules_count = np.unpackbits(
+            rules_mask.reshape(-1, 1), axis=1, count=3, bitorder='little'
+        ).sum(axis=1)
+
+        return pd.DataFrame({
+            'claim_id': claims_df['claim_id'].to_numpy(),
+            'rules_mask': rules_mask,
+            'unusual_combo': unusual_mask,
+            'high_amount': high_mask,
+            'high_amount_high_confidence': high_confidence,
+            'amount_threshold': thresholds,
+            'pct_of_threshold': pct_above,
+            'geographic_restriction': geo_mask,
+            'rules_activated_count': rules_count,
+            'review_required': rules_count > 0
+        })
+
+    @staticmethod
+    def trace_decision_pathway(rules_activated: List[Rule]) -> List[str]:
         """Trace the decision-making pathway"""
         pathway = []
-        
-        if any(rule['rule_id'] == 'UNUSUAL_COMBO' for rule in rules_activated):
+        rule_ids = {rule.rule_id for rule in rules_activated}
+
+        if 'UNUSUAL_COMBO' in rule_ids:
             pathway.append("Primary trigger: Unusual diagnosis-procedure combination")
-        
-        if any(rule['rule_id'] == 'HIGH_AMOUNT' for rule in rules_activated):
+
+        if 'HIGH_AMOUNT' in rule_ids:
             pathway.append("Supporting factor: Abnormally high claim amount")
-        
-        if any(rule['rule_id'] == 'GEOGRAPHIC_RESTRICTION' for rule in rules_activated):
+
+        if 'GEOGRAPHIC_RESTRICTION' in rule_ids:
             pathway.append("Geographic constraint violation")
-        
+
         return pathway
     
     @staticmethod
-    def assess_confidence(rules_activated: List[Dict]) -> Dict:
+    def assess_confidence(rules_activated: List[Rule]) -> Dict:
         """Assess confidence level for outlier detection"""
-        high_conf_rules = sum(1 for rule in rules_activated if rule['confidence'] == 'High')
+        high_conf_rules = sum(1 for rule in rules_activated if rule.confidence == 'High')
         total_rules = len(rules_activated)
         
         if total_rules == 0:
@@ -204,44 +359,53 @@ class MechanisticInterpreter:
         }
     
     @staticmethod
-    def generate_recommendations(rules_activated: List[Dict]) -> List[str]:
+    def generate_recommendations(rules_activated: List[Rule]) -> List[str]:
         """Generate human review recommendations"""
         recommendations = []
-        
-        if any(rule['rule_id'] == 'UNUSUAL_COMBO' for rule in rules_activated):
+        rule_ids = {rule.rule_id for rule in rules_activated}
+
+        if 'UNUSUAL_COMBO' in rule_ids:
             recommendations.append("Review medical necessity of procedure-diagnosis combination")
-        
-        if any(rule['rule_id'] == 'HIGH_AMOUNT' for rule in rules_activated):
+
+        if 'HIGH_AMOUNT' in rule_ids:
             recommendations.append("Verify procedure coding and duration justification")
-        
-        if any(rule['rule_id'] == 'GEOGRAPHIC_RESTRICTION' for rule in rules_activated):
+
+        if 'GEOGRAPHIC_RESTRICTION' in rule_ids:
             recommendations.append("Confirm patient residency and coverage eligibility")
-        
+
         return recommendations
     
     @staticmethod
     def check_demographic_fairness(claims_df: pd.DataFrame) -> Dict:
         """Monitor fairness across demographics"""
         fairness_report = {}
-        
-        # Check outlier rates by state
-        if 'is_outlier' in claims_df.columns and 'patient_state' in claims_df.columns:
-            state_outlier_rates = claims_df.groupby('patient_state')['is_outlier'].mean()
-            fairness_report['state_disparities'] = {
-                'max_rate': state_outlier_rates.max(),
-                'min_rate': state_outlier_rates.min(),
-                'ratio': state_outlier_rates.max() / state_outlier_rates.min() if state_outlier_rates.min() > 0 else float('inf')
-            }
-        
-        # Check by provider
-        if 'is_outlier' in claims_df.columns and 'provider_name' in claims_df.columns:
-            provider_rates = claims_df.groupby('provider_name')['is_outlier'].mean()
-            fairness_report['provider_disparities'] = {
-                'max_rate': provider_rates.max(),
-                'min_rate': provider_rates.min(),
-                'ratio': provider_rates.max() / provider_rates.min() if provider_rates.min() > 0 else float('inf')
+
+        if 'is_outlier' not in claims_df.columns:
+            return fairness_report
+
+        outlier_arr = claims_df['is_outlier'].to_numpy(dtype=float)
+
+        # One bincount pass per grouping column instead of a full groupby scan
+        for column, report_key in (('patient_state', 'state_disparities'),
+                                   ('provider_name', 'provider_disparities')):
+            if column not in claims_df.columns:
+                continue
+            # factorize marks nulls with -1; drop them like groupby did,
+            # bincount rejects negative codes
+            codes, _ = pd.factorize(claims_df[column])
+            non_null = codes >= 0
+            codes = codes[non_null]
+            if codes.size == 0:
+                continue
+            rates = np.bincount(codes, weights=outlier_arr[non_null]) / np.bincount(codes)
+            max_rate = rates.max()
+            min_rate = rates.min()
+            fairness_report[report_key] = {
+                'max_rate': max_rate,
+                'min_rate': min_rate,
+                'ratio': max_rate / min_rate if min_rate > 0 else float('inf')
             }
-        
+
         return fairness_report
     
     @staticmethod
@@ -266,15 +430,9 @@ class MechanisticInterpreter:
         counterfactuals = []
         current_amount = claim_data.get('claim_amount', 0)
         procedure = claim_data.get('procedure_type')
-        
+
         # Amount-based counterfactuals
-        procedure_thresholds = {
-            'Virtual Consultation': 450,
-            'Mental Health Session': 600,
-            'Emergency Consult': 900
-        }
-        
-        threshold = procedure_thresholds.get(procedure)
+        threshold = _COUNTERFACTUAL_THRESH.get(procedure)
         if threshold and current_amount > threshold:
             safe_amount = threshold * 0.9
             counterfactuals.append(
@@ -285,17 +443,23 @@ class MechanisticInterpreter:
         return counterfactuals
     
     @staticmethod
-    def create_audit_log(claim_data: Dict, rules_activated: List[Dict], decision: str) -> Dict:
+    def create_audit_log(claim_data: Dict, rules_activated: List[Rule], decision: str) -> Dict:
         """Create comprehensive audit log"""
-        # Create hash for data integrity
-        data_hash = hashlib.md5(json.dumps(claim_data, sort_keys=True).encode()).hexdigest()
+        # Create hash for data integrity (blake2b beats md5 and this is an
+        # integrity check, not a cryptographic commitment; orjson keeps
+        # serialization at C level)
+        data_hash = hashlib.blake2b(
+            orjson.dumps(claim_data, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
         
         audit_entry = {
-            'timestamp': datetime.datetime.utcnow().isoformat(),
+            # Raw nanosecond stamp: no per-call datetime allocation or string
+            # formatting; AuditLogWriter converts the column in bulk at flush
+            'timestamp_ns': time.time_ns(),
             'claim_id': claim_data.get('claim_id'),
             'decision': decision,
-            'rules_activated': [rule['rule_id'] for rule in rules_activated],
-            'confidence_scores': [rule.get('confidence', 'Unknown') for rule in rules_activated],
+            'rules_activated': [rule.rule_id for rule in rules_activated],
+            'confidence_scores': [rule.confidence for rule in rules_activated],
             'decision_pathway': MechanisticInterpreter.trace_decision_pathway(rules_activated),
             'system_version': '1.0',
             'audit_hash': data_hash,
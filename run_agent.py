@@ -10,6 +10,56 @@ from typing import Dict
 APP_NAME = "data_agent_app"
 USER_ID = "insurance_analyst_101"
 
+# PII patterns fused into one alternation so detection is a single linear
+# scan of the response instead of one pass per pattern. The email local
+# part uses a possessive quantifier (re supports them since 3.11): '@' can
+# never appear inside the class, so giving characters back can never help,
+# and long runs of local-part characters without an '@' no longer backtrack.
+_PII_RE = re.compile(
+    r'(?P<ssn>\b\d{3}-\d{2}-\d{4}\b)'
+    r'|(?P<email>\b[A-Za-z0-9._%+-]++@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+)
+
+# Keyword categories for response classification. All categories are
+# matched in one combined-alternation scan over a single lower-cased copy
+# of the response (automaton-style), instead of one substring pass per
+# keyword plus repeated case conversions. Keywords must be lowercase:
+# the response is case-folded exactly once and never re-folded per check.
+# Sentinel for structured outlier-analysis responses: IGNORECASE search
+# short-circuits at the first hit with no case-folded copy of the text
+_OUTLIER_SENTINEL = re.compile(
+    r'OUTLIER|FLAGGED|BUSINESS RULE|TRIGGERED RULES|INTERPRETABILITY', re.IGNORECASE
+)
+
+_ERROR_INDICATORS = (
+    "error occurred",
+    "unable to retrieve",
+    "failed to process",
+    "timeout",
+    "connection failed"
+)
+
+_QUESTION_KEYWORDS = frozenset({
+    'claims', 'outlier', 'amount', 'procedure', 'diagnosis', 'state',
+    'provider', 'flagged', 'analysis', 'distribution'
+})
+
+# Longest-first so longer phrases win over any shared prefixes. Question
+# keywords are single words and matched against tokens instead (exact-word
+# semantics: 'state' should not hit inside 'statement').
+_KEYWORD_RE = re.compile('|'.join(
+    re.escape(keyword) for keyword in
+    sorted(_ERROR_INDICATORS, key=len, reverse=True)
+))
+
+_TOKEN_RE = re.compile(r'[a-z]+')
+
+# Structured-response section markers, found in one scan instead of one
+# full-text pass per section; the regex is derived from the tuple so the
+# two cannot drift apart
+_REQUIRED_SECTIONS = ('SUMMARY:', 'TRIGGERED RULES:', 'CONFIDENCE:', 'RECOMMENDATION:')
+_SECTIONS_RE = re.compile('|'.join(re.escape(section) for section in _REQUIRED_SECTIONS))
+
 def validate_agent_response(response_text: str) -> Dict:
     """Smart validation that adapts to different response types"""
     validation_results = {
@@ -18,74 +68,65 @@ def validate_agent_response(response_text: str) -> Dict:
         'warnings': []
     }
     
+    # Strip once; both length checks reuse the same computation
+    stripped_len = len(response_text.strip()) if response_text else 0
+
     # Check for completely empty responses
-    if not response_text or len(response_text.strip()) < 5:
+    if stripped_len < 5:
         validation_results['errors'].append("Response is empty or too short")
         validation_results['valid'] = False
         return validation_results
     
+    # One scan of the lower-cased response covers all keyword categories
+    text_lower = response_text.lower()
+    found_keywords = set(_KEYWORD_RE.findall(text_lower))
+
     # Check if it's meant to be a structured outlier analysis response
-    is_outlier_analysis = any(keyword in response_text.upper() for keyword in [
-        'OUTLIER', 'FLAGGED', 'BUSINESS RULE', 'TRIGGERED RULES', 'INTERPRETABILITY'
-    ])
-    
+    is_outlier_analysis = bool(_OUTLIER_SENTINEL.search(response_text))
+
     if is_outlier_analysis:
         # For outlier analysis, expect structured format
-        required_sections = ['SUMMARY:', 'TRIGGERED RULES:', 'CONFIDENCE:', 'RECOMMENDATION:']
-        missing_sections = []
-        
-        for section in required_sections:
-            if section not in response_text:
-                missing_sections.append(section)
-        
+        found_sections = {match.group() for match in _SECTIONS_RE.finditer(response_text)}
+        missing_sections = [section for section in _REQUIRED_SECTIONS
+                            if section not in found_sections]
+
         if missing_sections:
             validation_results['warnings'].append(f"Structured response missing sections: {missing_sections}")
             # Don't mark as invalid - just warn
     
     # Check for obvious errors or system failures
-    error_indicators = [
-        "error occurred",
-        "unable to retrieve",
-        "failed to process",
-        "timeout",
-        "connection failed"
-    ]
-    
-    for indicator in error_indicators:
-        if indicator.lower() in response_text.lower():
+    for indicator in _ERROR_INDICATORS:
+        if indicator in found_keywords:
             validation_results['errors'].append(f"Response indicates system error: {indicator}")
             validation_results['valid'] = False
     
-    # Check for PII patterns
-    pii_patterns = [
-        r'\b\d{3}-\d{2}-\d{4}\b',  # SSN pattern
-        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'  # Email pattern
-    ]
-    
-    for pattern in pii_patterns:
-        if re.search(pattern, response_text):
-            validation_results['warnings'].append("Potential PII detected in response")
+    # Check for PII patterns (single fused scan; lastgroup names the kind)
+    pii_match = _PII_RE.search(response_text)
+    if pii_match:
+        validation_results['warnings'].append(
+            f"Potential PII detected in response ({pii_match.lastgroup})"
+        )
     
     # Check for reasonable content length and structure
-    if len(response_text.strip()) < 20:
+    if stripped_len < 20:
         validation_results['warnings'].append("Response seems very short")
     
-    # Check if response actually addresses the question (basic heuristic)
-    question_keywords = [
-        'claims', 'outlier', 'amount', 'procedure', 'diagnosis', 'state', 
-        'provider', 'flagged', 'analysis', 'distribution'
-    ]
-    
-    has_relevant_content = any(keyword.lower() in response_text.lower() 
-                              for keyword in question_keywords)
-    
+    # Check if response actually addresses the question (basic heuristic):
+    # tokenize once and intersect with the keyword frozenset
+    tokens = set(_TOKEN_RE.findall(text_lower))
+    has_relevant_content = not _QUESTION_KEYWORDS.isdisjoint(tokens)
+
     if not has_relevant_content:
         validation_results['warnings'].append("Response may not be relevant to insurance claims analysis")
     
     return validation_results
 
-async def run_conversation(prompt: str):
-    """Runs a conversation with the Insurance Claims agent using the ADK Runner."""
+async def run_conversation(prompt: str, record_trajectory: bool = True):
+    """Runs a conversation with the Insurance Claims agent using the ADK Runner.
+
+    Pass record_trajectory=False on validation-only paths to skip copying
+    tool-call args out of every function-call event.
+    """
     
     session_service = InMemorySessionService()
     session_id = f"{APP_NAME}-{uuid.uuid4().hex[:8]}"
@@ -108,14 +149,12 @@ async def run_conversation(prompt: str):
             new_message=types.Content(role="user", parts=[types.Part(text=prompt)]),
         ):
 
-            if (
-                event.content
-                and event.content.parts
-                and event.content.parts[0].function_call
-            ):
-
-                func_call = event.content.parts[0].function_call
+            # Resolve the content/parts attribute chain once per event
+            content = event.content
+            parts = content.parts if content else None
+            first_part = parts[0] if parts else None
 
+            if record_trajectory and first_part and (func_call := first_part.function_call):
                 tool_call = {
                     "tool_name": func_call.name,
                     "tool_input": dict(func_call.args),
@@ -123,8 +162,8 @@ async def run_conversation(prompt: str):
                 tool_calls.append(tool_call)
 
             if event.is_final_response():
-                if event.content and event.content.parts:
-                    final_response_text = event.content.parts[0].text
+                if first_part:
+                    final_response_text = first_part.text
                 break
 
     except Exception as e:
@@ -3,22 +3,34 @@
 Script to set up and verify the environment
 """
 
+import functools
 import os
 import subprocess
 import sys
 
-def setup_environment():
-    """Set up the required environment variables"""
-    
-    # Get the current project
+@functools.lru_cache(maxsize=1)
+def _detect_project():
+    """Detect the active project, shelling out to gcloud at most once"""
+
+    # Respect an explicit env var before paying for a subprocess
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
+    if project_id:
+        return project_id
+
     try:
         result = subprocess.run([
             "gcloud", "config", "get-value", "project"
         ], capture_output=True, text=True, check=True)
-        project_id = result.stdout.strip()
+        return result.stdout.strip()
     except:
-        project_id = "woven-invention-469721-s1"  # Your project ID
-    
+        return "woven-invention-469721-s1"  # Your project ID
+
+def setup_environment():
+    """Set up the required environment variables"""
+
+    # Get the current project
+    project_id = _detect_project()
+
     # Set environment variables
     os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
     os.environ["GOOGLE_CLOUD_LOCATION"] = "us-central1"
@@ -1,20 +1,121 @@
 import json
+import orjson
 import os
 import asyncio
+import hashlib
+import threading
 import run_agent
 import numbers
 import math
 
+# Disk cache for agent responses, keyed by prompt hash. Metric re-runs
+# replay cached inferences instead of re-invoking the agent.
+# EVAL_CACHE_MODE: "enabled" (read + write, default), "replay" (read-only,
+# cache misses fail fast), "disabled" (always invoke the agent).
+_CACHE_DIR = "agent_cache"
 
-def get_agent_response(prompt: str) -> dict:
+# Cache keys include a hash of the agent definition so editing the agent
+# (model, instructions, tools — its temperature and model name live in that
+# source) invalidates old entries instead of replaying stale responses
+_AGENT_SOURCE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data_agent_app", "agent.py"
+)
+
+
+def _agent_version() -> str:
+   try:
+       with open(_AGENT_SOURCE, "rb") as f:
+           return hashlib.sha256(f.read()).hexdigest()
+   except OSError:
+       return "unknown"
+
+
+_AGENT_VERSION = _agent_version()
+
+# One persistent event loop per thread for sync callers: asyncio.run would
+# create and tear down a loop (plus its selector and connection pools) per
+# prompt, while a single shared loop would break under EvalTask, which
+# invokes the runnable from a thread pool — run_until_complete raises if
+# the loop is already running in another thread
+_LOOPS = threading.local()
+
+
+def _get_loop():
+   loop = getattr(_LOOPS, "loop", None)
+   if loop is None or loop.is_closed():
+       loop = asyncio.new_event_loop()
+       _LOOPS.loop = loop
+   return loop
+
+
+def _cache_path(prompt: str) -> str:
+   key = hashlib.sha256(f"{_AGENT_VERSION}|{prompt}".encode()).hexdigest()
+   return os.path.join(_CACHE_DIR, f"{key}.json")
+
+
+def _is_cacheable(response: dict) -> bool:
+   """Only validated answers are cached — run_conversation swallows agent
+   exceptions into error-text responses, and replaying a transient failure
+   forever would poison the prompt's cache entry."""
+
+   validation = response.get("validation_results")
+   return bool(validation and validation.get("valid"))
+
+
+async def get_agent_response_async(prompt: str) -> dict:
    """Invokes the agent with a prompt and returns its response."""
 
+   cache_mode = os.getenv("EVAL_CACHE_MODE", "enabled")
+   cache_file = _cache_path(prompt)
+
+   if cache_mode != "disabled":
+       if os.path.exists(cache_file):
+           with open(cache_file) as f:
+               return json.load(f)
+       if cache_mode == "replay":
+           return {"response": "Error: No cached response for prompt in replay mode."}
+
    try:
-       response = asyncio.run(run_agent.run_conversation(prompt))  # Invoke the agent
-       return response
+       response = await run_agent.run_conversation(prompt)  # Invoke the agent
    except Exception as e:
        return {"response": "Error: Agent failed to produce a response."}
 
+   if cache_mode == "enabled" and _is_cacheable(response):
+       os.makedirs(_CACHE_DIR, exist_ok=True)
+       with open(cache_file, "w") as f:
+           json.dump(response, f)
+   return response
+
+
+def get_agent_response(prompt: str) -> dict:
+   """Sync wrapper around get_agent_response_async reusing one event loop."""
+
+   return _get_loop().run_until_complete(get_agent_response_async(prompt))
+
+
+async def get_agent_responses_async(prompts, concurrency: int = 8) -> list:
+   """Evaluates prompts concurrently, bounded by a semaphore.
+
+   N prompts complete in roughly the slowest round-trip times N/concurrency
+   instead of the sum of all round-trips.
+   """
+
+   semaphore = asyncio.Semaphore(concurrency)
+
+   async def bounded(prompt):
+       async with semaphore:
+           return await get_agent_response_async(prompt)
+
+   return await asyncio.gather(*(bounded(prompt) for prompt in prompts))
+
+
+def get_agent_responses(prompts, concurrency: int = 8) -> list:
+   """Sync wrapper around get_agent_responses_async reusing one event loop."""
+
+   return _get_loop().run_until_complete(
+       get_agent_responses_async(prompts, concurrency)
+   )
+
 
 def save_evaluation_results(eval_result, experiment_run):
    """Processes, saves, and prints the evaluation results for a single run."""
@@ -24,21 +125,25 @@ def save_evaluation_results(eval_result, experiment_run):
        "eval_results", f"bq_agent_eval_results_{experiment_run}.json"
    )
 
-   # Prepare data for JSON serialization
-   eval_result_dict = {
-       "summary_metrics": eval_result.summary_metrics,
-       "pointwise_metrics": eval_result.metrics_table.to_dict("records"),
-   }
    # --- Save the results as a JSON file ---
-   with open(output_file_path, "w") as f:
-       json.dump(eval_result_dict, f, indent=4)
+   # orjson serializes the summary (including numpy scalars) at C level;
+   # the metrics table still goes through pandas' C-level to_json rather
+   # than a per-row records list (which doubles peak memory)
+   with open(output_file_path, "wb") as f:
+       f.write(b'{"summary_metrics": ')
+       f.write(orjson.dumps(
+           eval_result.summary_metrics,
+           option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+       ))
+       f.write(b', "pointwise_metrics": ')
+       f.write(eval_result.metrics_table.to_json(orient="records", indent=4).encode())
+       f.write(b'}')
    print(f"Results for run '{experiment_run}' saved to {output_file_path}")
 
 
 def print_evaluation_summary(eval_result):
    """Prints a detailed summary of the evaluation results, including summary-level and aggregated pointwise metrics."""
   
-   pointwise_metrics = eval_result.metrics_table
    # Print summary metrics for the current run
    summary_metrics = eval_result.summary_metrics
    if summary_metrics:
@@ -52,17 +157,21 @@ def print_evaluation_summary(eval_result):
        print("No summary metrics found for this run.")
    print("\n" + "=" * 50 + "\n")
 
-   if not pointwise_metrics.empty:
-       total_questions = len(pointwise_metrics)
-       avg_completeness_score = pointwise_metrics["completeness_metric/score"].mean()
-       avg_factual_accuracy_score = pointwise_metrics[
-           "factual_accuracy_metric/score"
-       ].mean()
-       print("\n" + "=" * 50 + "\n")
-       print("--- Aggregated Evaluation Summary ---")
-       print(f"Total questions in evaluation dataset: {total_questions}")
-       print(f"Average Completeness Score: {avg_completeness_score:.2f}")
-       print(f"Average Factual Accuracy Score: {avg_factual_accuracy_score:.2f}")
-       print("\n" + "=" * 50 + "\n")
-   else:
-       print("\nNo successful evaluation runs were completed.")
\ No newline at end of file
+   # Bind the metrics table only where it is used and bail out early when
+   # there is nothing to aggregate
+   pointwise_metrics = eval_result.metrics_table
+   if pointwise_metrics.empty:
+       print("\nNo successful evaluation runs were completed.")
+       return
+
+   total_questions = len(pointwise_metrics)
+   # Single reduction pass over both score columns
+   mean_scores = pointwise_metrics[
+       ["completeness_metric/score", "factual_accuracy_metric/score"]
+   ].mean()
+   print("\n" + "=" * 50 + "\n")
+   print("--- Aggregated Evaluation Summary ---")
+   print(f"Total questions in evaluation dataset: {total_questions}")
+   print(f"Average Completeness Score: {mean_scores['completeness_metric/score']:.2f}")
+   print(f"Average Factual Accuracy Score: {mean_scores['factual_accuracy_metric/score']:.2f}")
+   print("\n" + "=" * 50 + "\n")
\ No newline at end of file
@@ -3,16 +3,17 @@
 Script to verify BigQuery data setup and permissions
 """
 
-from google.cloud import bigquery
 import os
 
+from bq_client import get_client
+
 def verify_bigquery_setup():
     """Verify that BigQuery dataset and table are properly set up"""
     
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     print(f"Checking BigQuery setup for project: {project_id}")
     
-    client = bigquery.Client(project=project_id)
+    client = get_client(project_id)
     
     # Check if dataset exists
     dataset_id = "insurance_claims"
@@ -38,14 +39,13 @@ def verify_bigquery_setup():
         print(f"❌ Table '{table_id}' not found: {e}")
         return False
     
-    # Test query permissions
+    # Test read permissions with a tabledata.list RPC — zero bytes billed
+    # and constant time, unlike a COUNT(*) that scans the table
     try:
-        query_job = client.query(f"SELECT COUNT(*) as count FROM `{project_id}.{dataset_id}.{table_id}` LIMIT 1")
-        results = query_job.result()
-        for row in results:
-            print(f"✅ Query permissions: OK (found {row.count} rows)")
+        list(client.list_rows(table_ref, max_results=1))
+        print(f"✅ Read permissions: OK ({table.num_rows} rows per table metadata)")
     except Exception as e:
-        print(f"❌ Query permissions failed: {e}")
+        print(f"❌ Read permissions failed: {e}")
         return False
     
     return True